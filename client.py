@@ -12,9 +12,12 @@ import serial.tools.list_ports
 import struct
 import time
 import argparse
+import math
 import os
+import sys
 import json
-from typing import List, Dict, Any, Tuple, Optional
+from collections import deque
+from typing import List, Dict, Any, Tuple, Optional, Callable, Iterator
 
 # Try to import readline for autocompletion/history.
 try:
@@ -25,6 +28,12 @@ except Exception:
     except Exception:
         readline = None
 
+# orjson is optional; it is only used to speed up JSON output.
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # ---------------------------
 # Protocol constants
 # ---------------------------
@@ -40,9 +49,24 @@ CMD_RESET = 7
 
 SUCCESS_CODE = 0xFF
 ERROR_CODE = 0xFE
+TERMINATORS = frozenset((SUCCESS_CODE, ERROR_CODE))
 
 DEFAULT_BAUD = 9600
 
+# Max commands in flight during 'run <file>'. Pipelined commands are
+# at most 3 bytes and the firmware holds BUFFER_SIZE (10) bytes plus
+# the 64-byte serial RX buffer, so 4 never overflows the device.
+RUN_PIPELINE_WINDOW = 4
+
+# Precompiled wire formats.
+_B = struct.Struct("<B")
+_BB = struct.Struct("<BB")
+_U16_LE = struct.Struct("<H")
+
+# Fixed-layout parts of the INFO response.
+_INFO_HEADER = struct.Struct("<IHHIII")
+_INFO_FIXED_BYTES = struct.Struct("<8B")
+
 # ---------------------------
 # Storage paths
 # ---------------------------
@@ -92,36 +116,39 @@ REPL_COMMANDS_ALIASES = {
 # Command handling
 # ---------------------------
 
+# Named values accepted by digitalwrite and pinmode.
+_DIGITAL_VALUES = {
+    "on": 1, "true": 1, "high": 1, "h": 1,
+    "off": 0, "false": 0, "low": 0, "l": 0,
+}
+_PIN_MODES = {
+    "in": 0, "input": 0,
+    "out": 1, "output": 1,
+    "input_pullup": 2, "pullup": 2,
+}
+
 def build_args_nop(args: List[str]) -> bytes: return b''
 def build_args_digitalread(args: List[str]) -> bytes:
     if len(args) < 1: raise ValueError("digitalread requires pin number")
-    return bytes([int(args[0])])
+    return _B.pack(int(args[0]))
 def build_args_analogread(args: List[str]) -> bytes:
     if len(args) < 1: raise ValueError("analogread requires pin number")
-    return bytes([int(args[0])])
+    return _B.pack(int(args[0]))
 def build_args_digitalwrite(args: List[str]) -> bytes:
     if len(args) < 2: raise ValueError("digitalwrite requires pin and value")
     val = args[1]
     if isinstance(val, str):
-        if val.lower() in ("on", "true", "high", "h"): 
-            val = 1
-        elif val.lower() in ("off", "false", "low", "l"): 
-            val = 0
-    return bytes([int(args[0]), int(val) & 0xFF])
+        val = _DIGITAL_VALUES.get(val.lower(), val)
+    return _BB.pack(int(args[0]), int(val) & 0xFF)
 def build_args_analogwrite(args: List[str]) -> bytes:
     if len(args) < 2: raise ValueError("analogwrite requires pin and value")
-    return bytes([int(args[0]), int(args[1]) & 0xFF])
+    return _BB.pack(int(args[0]), int(args[1]) & 0xFF)
 def build_args_pinmode(args: List[str]) -> bytes:
     if len(args) < 2: raise ValueError("pinmode requires pin and mode")
     mode = args[1]
     if isinstance(mode, str):
-        if mode.lower() in ("in", "input"): 
-            mode = 0
-        elif mode.lower() in ("out", "output"): 
-            mode = 1
-        elif mode.lower() in ("input_pullup", "pullup"): 
-            mode = 2
-    return bytes([int(args[0]), int(mode) & 0xFF])
+        mode = _PIN_MODES.get(mode.lower(), mode)
+    return _BB.pack(int(args[0]), int(mode) & 0xFF)
 
 def parse_response_without_payload(payload: bytes, term: int) -> Dict[str, Any]: return {"ok": term == SUCCESS_CODE}
 def parse_response_reset(payload: bytes, term: int) -> Dict[str, Any]:
@@ -135,26 +162,16 @@ def parse_response_analogread(payload: bytes, term: int) -> Dict[str, Any]:
     if term == ERROR_CODE: return {"ok": False, "error": "device error"}
     if len(payload) < 2:
         return {"ok": False, "error": "short payload"}
-    val, = struct.unpack_from("<H", payload)
+    val, = _U16_LE.unpack_from(payload)
     return {"ok": True, "value": val}
 def parse_response_info(payload: bytes, term: int) -> Dict[str, Any]:
     try:
-        off = 0
-        millis, = struct.unpack_from("<I", payload, off); off += 4
-        free_ram, = struct.unpack_from("<H", payload, off); off += 2
-        total_ram, = struct.unpack_from("<H", payload, off); off += 2
-        flash_size, = struct.unpack_from("<I", payload, off); off += 4
-        cpu_freq, = struct.unpack_from("<I", payload, off); off += 4
-        version, = struct.unpack_from("<I", payload, off); off += 4
-
-        buffer_size = payload[off]; off += 1
-        digital_pins = payload[off]; off += 1
-        total_pins = payload[off]; off += 1
-        max_soft_pwm = payload[off]; off += 1
-        soft_pwm_freq = payload[off]; off += 1
-        commands_count = payload[off]; off += 1
-        succ = payload[off]; off += 1
-        err = payload[off]; off += 1
+        millis, free_ram, total_ram, flash_size, cpu_freq, version = _INFO_HEADER.unpack_from(payload, 0)
+        off = _INFO_HEADER.size
+
+        (buffer_size, digital_pins, total_pins, max_soft_pwm,
+         soft_pwm_freq, commands_count, succ, err) = _INFO_FIXED_BYTES.unpack_from(payload, off)
+        off += _INFO_FIXED_BYTES.size
 
         hw_len = payload[off]; off += 1
         hw = list(payload[off:off+hw_len]); off += hw_len
@@ -184,6 +201,18 @@ def parse_response_info(payload: bytes, term: int) -> Dict[str, Any]:
     except Exception as e:
         return {"ok": False, "error": f"parse fail: {e}"}
 
+def info_response_complete(buf: bytearray) -> bool:
+    # INFO carries its own lengths: fixed fields, hw pins, info string,
+    # then the terminator.
+    off = _INFO_HEADER.size + _INFO_FIXED_BYTES.size
+    if len(buf) <= off:
+        return False
+    off += 1 + buf[off]
+    if len(buf) <= off:
+        return False
+    off += 1 + buf[off]
+    return len(buf) > off and buf[-1] in TERMINATORS
+
 COMMANDS = {
     "nop":          (CMD_NOP,          build_args_nop,          parse_response_without_payload),
     "info":         (CMD_INFO,         build_args_nop,          parse_response_info           ),
@@ -195,6 +224,20 @@ COMMANDS = {
     "reset":        (CMD_RESET,        build_args_nop,          parse_response_reset          ),
 }
 
+# Payload size of fixed-size replies, keyed by parser. Parsers not listed
+# here (INFO) have a variable-size reply.
+PAYLOAD_SIZES = {
+    parse_response_without_payload: 0,
+    parse_response_reset:           0,
+    parse_response_digitalread:     1,
+    parse_response_analogread:      2,
+}
+
+# Completeness checks for variable-size replies, keyed by parser.
+RESPONSE_CHECKS = {
+    parse_response_info: info_response_complete,
+}
+
 # ---------------------------
 # REPL command handling
 # ---------------------------
@@ -220,12 +263,14 @@ def repl_alias(state: Dict[str, Any], args: List[str]) -> None:
         target = args[2]
         user_aliases[alias_name] = target
         save_user_aliases(user_aliases)
+        rebuild_dispatch()
         print(f"alias added: {alias_name} -> {target}")
     elif sub == "rm" and len(args) >= 2:
         alias_name = args[1]
         if alias_name in user_aliases:
             user_aliases.pop(alias_name)
             save_user_aliases(user_aliases)
+            rebuild_dispatch()
             print(f"alias removed: {alias_name}")
         else:
             print("alias not found")
@@ -261,53 +306,127 @@ def repl_run(state: Dict[str, Any], args: List[str]) -> None:
     if not os.path.exists(fname):
         print("file not found:", fname)
         return
+    ser = state["ser"]
+    # Commands without payload get a fixed one-byte reply, so several can be
+    # sent ahead and their replies matched in order. Anything else drains
+    # the window first and runs synchronously.
+    pending = deque()  # (line, parse) waiting for a reply
+    pipelining = True
+
+    def complete_oldest() -> None:
+        line, parse = pending.popleft()
+        print("> " + line)
+        raw = read_response(ser, payload_size=0)
+        print_res(decode_response(raw, parse), state["json"])
+        if raw is None:
+            resync()
+
+    def resync() -> None:
+        # A lost reply would shift every later reply onto the wrong line:
+        # give up on the commands in flight, drop anything that arrives
+        # late and run the rest of the file synchronously.
+        nonlocal pipelining
+        pipelining = False
+        while pending:
+            line, _ = pending.popleft()
+            print("> " + line)
+            print_res({"ok": False, "error": "reply lost after an earlier timeout"}, state["json"])
+        time.sleep(0.02)
+        ser.reset_input_buffer()
+
+    def drain() -> None:
+        try:
+            while pending:
+                complete_oldest()
+        except Exception:
+            # Replies could not be read; drop them so they are not
+            # matched to later commands.
+            pending.clear()
+            ser.reset_input_buffer()
+
     try:
-        with open(fname, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                print("> " + line)
-                subparts = line.split()
-                subcmd = subparts[0].lower()
-                subargs = subparts[1:]
-                res = run_one(state["ser"], subcmd, subargs)
-                print_res(res, state["json"])
+        try:
+            with open(fname, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    subparts = line.split()
+                    subcmd = subparts[0].lower()
+                    subargs = subparts[1:]
+
+                    entry = _DISPATCH.get(subcmd)
+                    if pipelining and entry is not None:
+                        code, build, parse, handler = entry
+                        cmd_args = None
+                        if parse is parse_response_without_payload and handler is None:
+                            try:
+                                cmd_args = build(subargs)
+                            except Exception:
+                                pass
+                        if cmd_args is not None:
+                            if len(pending) >= RUN_PIPELINE_WINDOW:
+                                complete_oldest()
+                            if pipelining:
+                                send_command(ser, code, cmd_args)
+                                pending.append((line, parse))
+                                continue
+
+                    drain()
+                    print("> " + line)
+                    res = run_one(ser, subcmd, subargs)
+                    print_res(res, state["json"])
+        finally:
+            # Also read replies to commands already sent when the file
+            # could not be read to the end.
+            drain()
     except Exception as e:
         print(f"error reading file: {e}")
 
-def repl_repeat(state: Dict[str, Any], args: List[str]) -> None:
+def parse_repeat_args(name: str, args: List[str]) -> Optional[Tuple[float, int, List[str]]]:
+    usage = f"usage: {name} [--delay MS] <count> <command...>"
+    delay = 0.0
+    if args and args[0] == "--delay":
+        if len(args) < 2:
+            print(usage)
+            return None
+        try:
+            delay = float(args[1]) / 1000
+        except ValueError:
+            delay = math.nan
+        if not (math.isfinite(delay) and delay >= 0):
+            print("delay must be a non-negative number")
+            return None
+        args = args[2:]
     if len(args) < 2:
-        print("usage: repeat <count> <command...>")
-        return
+        print(usage)
+        return None
     try:
         count = int(args[0])
     except ValueError:
         print("count must be integer")
+        return None
+    return delay, count, args[1:]
+
+def repl_repeat(state: Dict[str, Any], args: List[str]) -> None:
+    parsed = parse_repeat_args("repeat", args)
+    if parsed is None:
         return
-    subparts = args[1:]
-    for _ in range(count):
-        res = run_one(state["ser"], subparts[0], subparts[1:])
+    delay, count, subparts = parsed
+    for res in repeat_command(state["ser"], subparts[0], subparts[1:], count, delay):
         print_res(res, state["json"])
-        time.sleep(0.1)
 
 def repl_rvd(state: Dict[str, Any], args: List[str]) -> None:
-    if len(args) < 2:
-        print("usage: rvd <count> <command...>")
+    parsed = parse_repeat_args("rvd", args)
+    if parsed is None:
         return
-    try:
-        count = int(args[0])
-    except ValueError:
-        print("count must be integer")
-        return
-    subparts = args[1:]
-    for _ in range(count):
-        res = run_one(state["ser"], subparts[0], subparts[1:])
+    delay, count, subparts = parsed
+    for res in repeat_command(state["ser"], subparts[0], subparts[1:], count, delay):
         print(res.get("value", "N/A"))
-        time.sleep(0.1)
 
 REPL_COMMANDS = {
     "help":    repl_help,
+    "exit":    repl_exit,
     "quit":    repl_exit,
     "aliases": repl_aliases,
     "alias":   repl_alias,
@@ -318,6 +437,10 @@ REPL_COMMANDS = {
     "rvd":     repl_rvd,
 }
 
+# REPL commands and their aliases in one table.
+REPL_DISPATCH = dict(REPL_COMMANDS)
+REPL_DISPATCH.update({a: REPL_COMMANDS[t] for a, t in REPL_COMMANDS_ALIASES.items() if t in REPL_COMMANDS})
+
 # ---------------------------
 # Aliases loading/saving
 # ---------------------------
@@ -325,18 +448,27 @@ REPL_COMMANDS = {
 def load_user_aliases() -> Dict[str, str]:
     try:
         if os.path.exists(ALIASES_FILE):
-            with open(ALIASES_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
+            with open(ALIASES_FILE, "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson else json.loads(raw.decode("utf-8"))
+            if isinstance(data, dict):
+                return data
     except Exception:
         pass
     return {}
 
 def save_user_aliases(aliases: Dict[str, str]) -> None:
     try:
-        with open(ALIASES_FILE, "w", encoding="utf-8") as f:
-            json.dump(aliases, f, indent=2, ensure_ascii=False)
+        if orjson:
+            data = orjson.dumps(aliases, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        else:
+            data = json.dumps(aliases, indent=2, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        # Write to a temp file and rename so an interrupted save
+        # never leaves a truncated aliases file behind.
+        tmp = ALIASES_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, ALIASES_FILE)
     except Exception:
         pass
 
@@ -349,6 +481,29 @@ def resolve_alias(cmd: str) -> str:
         return BUILTIN_ALIASES[cmd][0]
     return cmd
 
+# name -> (code, build, parse, handler), with builtin and user aliases
+# already resolved. handler is set for aliases like on/off.
+_DISPATCH: Dict[str, Tuple[int, Any, Any, Any]] = {}
+
+def rebuild_dispatch() -> None:
+    d = {n: (code, build, parse, None) for n, (code, build, parse) in COMMANDS.items()}
+    for a, (t, handler) in BUILTIN_ALIASES.items():
+        if handler is None and t in COMMANDS:
+            d[a] = COMMANDS[t] + (None,)
+    for a, t in user_aliases.items():
+        if t in COMMANDS:
+            d[a] = COMMANDS[t] + (None,)
+        else:
+            d.pop(a, None)
+    # Special handlers win over user aliases, as they always did.
+    for a, (t, handler) in BUILTIN_ALIASES.items():
+        if handler is not None and t in COMMANDS:
+            d[a] = COMMANDS[t] + (handler,)
+    _DISPATCH.clear()
+    _DISPATCH.update(d)
+
+rebuild_dispatch()
+
 # ---------------------------
 # Port utilities & IO helpers
 # ---------------------------
@@ -364,39 +519,120 @@ def auto_detect_port() -> Optional[str]:
         return priority[0]
     return ports[0] if ports else None
 
-def open_port(port: str, baud: int = DEFAULT_BAUD, timeout: float = 0.1) -> serial.Serial:
+def open_port(port: str, baud: int = DEFAULT_BAUD, timeout: float = 0.1, reset_timeout: float = 2.0) -> serial.Serial:
     s = serial.Serial(port, baudrate=baud, timeout=timeout)
+    # Pulse DTR so the board resets into a known state, then wait for it
+    # to answer instead of sleeping for the worst-case boot time.
+    s.dtr = False
+    time.sleep(0.05)
     s.reset_input_buffer()
     s.reset_output_buffer()
-    time.sleep(2)  # Wait for Arduino to reset
+    s.dtr = True
+    wait_ready(s, reset_timeout)
     return s
 
+def wait_ready(ser: serial.Serial, overall_timeout: float = 2.0, probe_timeout: float = 0.1,
+               quiet_time: float = 0.1) -> bool:
+    deadline = time.monotonic() + overall_timeout
+    original_timeout = ser.timeout
+    ready = False
+    try:
+        # One probe at a time: the next NOP goes out only after the
+        # previous one has had probe_timeout to be answered.
+        ser.timeout = probe_timeout
+        while not ready and time.monotonic() < deadline:
+            send_command(ser, CMD_NOP)
+            b = ser.read(1)
+            ready = bool(b) and b[0] == SUCCESS_CODE
+        # Replies to earlier probes may still be on their way, on success
+        # and on timeout alike; read until the line stays quiet so none of
+        # them is taken for the reply to the first real command.
+        ser.timeout = quiet_time
+        quiet_deadline = time.monotonic() + overall_timeout
+        while ser.read(ser.in_waiting or 1) and time.monotonic() < quiet_deadline:
+            pass
+        return ready
+    finally:
+        ser.timeout = original_timeout
+
+def frame_command(cmd: int, args: bytes = b'') -> bytes:
+    return _B.pack(cmd) + args
+
 def send_command(ser: serial.Serial, cmd: int, args: bytes = b'') -> None:
-    ser.write(bytes([cmd]) + args)
+    ser.write(frame_command(cmd, args))
     ser.flush()
 
-def read_response(ser: serial.Serial, overall_timeout: float = 2.0, quiet_time: float = 0.02) -> Optional[bytes]:
-    buf = bytearray()
-    start = time.monotonic()
+def discard_stale_input(ser: serial.Serial) -> None:
+    # Bytes waiting before a command is sent cannot belong to its reply;
+    # left in place they would shift every fixed-size read after them.
+    if ser.in_waiting:
+        ser.reset_input_buffer()
+
+def read_response(ser: serial.Serial, overall_timeout: float = 2.0, quiet_time: float = 0.02,
+                  payload_size: Optional[int] = None,
+                  is_complete: Optional[Callable[[bytearray], bool]] = None) -> Optional[bytes]:
+    deadline = time.monotonic() + overall_timeout
     original_timeout = ser.timeout
-    ser.timeout = quiet_time
     try:
-        while (time.monotonic() - start) < overall_timeout:
-            b = ser.read(1)
-            if not b:
-                if buf and buf[-1] in (SUCCESS_CODE, ERROR_CODE):
-                    return bytes(buf)
-                continue
-            buf.append(b[0])
-            if buf[-1] in (SUCCESS_CODE, ERROR_CODE):
-                tail = ser.read(1)
-                if not tail:
-                    return bytes(buf)
-                buf.append(tail[0])
-        return bytes(buf) if buf else None
+        if payload_size is not None:
+            return read_fixed_response(ser, payload_size, deadline, quiet_time)
+        return read_until_quiet(ser, bytearray(), deadline, quiet_time, is_complete)
     finally:
         ser.timeout = original_timeout
 
+def read_until_quiet(ser: serial.Serial, buf: bytearray, deadline: float, quiet_time: float,
+                     is_complete: Optional[Callable[[bytearray], bool]] = None) -> Optional[bytes]:
+    ser.timeout = quiet_time
+    while time.monotonic() < deadline:
+        # Drain everything the driver already has in one read,
+        # or wait up to quiet_time for a byte if it has nothing.
+        n = ser.in_waiting
+        data = ser.read(n) if n else ser.read(1)
+        if data:
+            buf += data
+            if is_complete is not None and is_complete(buf):
+                return bytes(buf)
+            continue
+        # Payloads may contain terminator bytes, so without a
+        # completeness check a response ends only when the line is quiet.
+        if buf and buf[-1] in TERMINATORS:
+            return bytes(buf)
+    return bytes(buf) if buf else None
+
+def read_fixed_response(ser: serial.Serial, payload_size: int, deadline: float, quiet_time: float) -> Optional[bytes]:
+    # Reply is either payload + SUCCESS_CODE or a lone ERROR_CODE,
+    # so there is no need to wait for the line to go quiet.
+    ser.timeout = max(0.0, deadline - time.monotonic())
+    first = ser.read(1)
+    if not first:
+        return None
+    rest = b''
+    if first[0] == ERROR_CODE:
+        if payload_size == 0:
+            return first
+        # Error reply, or a payload byte equal to ERROR_CODE; only the
+        # latter is followed by more bytes.
+        ser.timeout = min(quiet_time, max(0.0, deadline - time.monotonic()))
+        rest = ser.read(payload_size)
+        if not rest:
+            return first
+    elif payload_size:
+        ser.timeout = max(0.0, deadline - time.monotonic())
+        rest = ser.read(payload_size)
+    resp = first + rest
+    size = payload_size + 1
+    if len(resp) == size and resp[-1] == SUCCESS_CODE:
+        return resp
+
+    # Out of step with the device (stray or late bytes): read until the
+    # line is quiet and keep only the newest reply.
+    buf = read_until_quiet(ser, bytearray(resp), deadline, quiet_time)
+    if buf[-1] == SUCCESS_CODE and len(buf) >= size:
+        return buf[-size:]
+    if buf[-1] == ERROR_CODE:
+        return buf[-1:]
+    return buf
+
 def split_payload_and_terminator(resp: bytes) -> Tuple[bytes, int]:
     if not resp:
         return b'', -1
@@ -406,37 +642,77 @@ def split_payload_and_terminator(resp: bytes) -> Tuple[bytes, int]:
 # High-level executor
 # ---------------------------
 
+# Pretty-print JSON for a terminal; one compact line per result when piped.
+PRETTY_JSON = sys.stdout.isatty()
+
+def dumps_res(res: Dict[str, Any]) -> str:
+    if orjson:
+        opts = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS if PRETTY_JSON else 0
+        return orjson.dumps(res, option=opts).decode("utf-8")
+    if PRETTY_JSON:
+        return json.dumps(res, ensure_ascii=False, indent=2, sort_keys=True)
+    return json.dumps(res, ensure_ascii=False, separators=(",", ":"))
+
 def print_res(res: Dict[str, Any], json_mode: bool) -> None:
     if json_mode:
-        print(json.dumps(res, ensure_ascii=False, indent=2, sort_keys=True))
+        print(dumps_res(res))
     else:
         for k, v in res.items():
             print(f"{k}: {v}")
 
-def run_one(ser: serial.Serial, name: str, a: List[str]) -> Dict[str, Any]:
-    name_real = resolve_alias(name)
-
-    if name in BUILTIN_ALIASES:
-        handler = BUILTIN_ALIASES[name][1]
-        if handler is not None:
-            return handler(ser, a)
+def decode_response(raw: Optional[bytes], parse) -> Dict[str, Any]:
+    if raw is None:
+        return {"ok": False, "error": "no response"}
+    payload, term = split_payload_and_terminator(raw)
+    return parse(payload, term)
 
-    if name_real not in COMMANDS:
-        return {"ok": False, "error": f"unknown command: {name_real}"}
+def run_one(ser: serial.Serial, name: str, a: List[str]) -> Dict[str, Any]:
+    entry = _DISPATCH.get(name)
+    if entry is None:
+        return {"ok": False, "error": f"unknown command: {resolve_alias(name)}"}
 
-    code, build, parse = COMMANDS[name_real]
+    code, build, parse, handler = entry
+    if handler is not None:
+        return handler(ser, a)
     try:
         args = build(a)
     except Exception as e:
         return {"ok": False, "error": f"arg build error: {e}"}
 
+    discard_stale_input(ser)
     send_command(ser, code, args)
-    raw = read_response(ser)
-    if raw is None:
-        return {"ok": False, "error": "no response"}
-
-    payload, term = split_payload_and_terminator(raw)
-    return parse(payload, term)
+    raw = read_response(ser, payload_size=PAYLOAD_SIZES.get(parse), is_complete=RESPONSE_CHECKS.get(parse))
+    return decode_response(raw, parse)
+
+def repeat_command(ser: serial.Serial, name: str, a: List[str], count: int, delay: float = 0.0) -> Iterator[Dict[str, Any]]:
+    entry = _DISPATCH.get(name)
+    if entry is not None:
+        code, build, parse, handler = entry
+        wire = None
+        if handler is None:
+            try:
+                wire = frame_command(code, build(a))
+            except Exception:
+                pass
+        if wire is not None:
+            # Every iteration sends the same bytes, so they are built once.
+            payload_size = PAYLOAD_SIZES.get(parse)
+            is_complete = RESPONSE_CHECKS.get(parse)
+            for _ in range(count):
+                discard_stale_input(ser)
+                ser.write(wire)
+                ser.flush()
+                raw = read_response(ser, payload_size=payload_size, is_complete=is_complete)
+                yield decode_response(raw, parse)
+                if delay:
+                    time.sleep(delay)
+            return
+
+    # Unknown commands, special handlers and bad args report through run_one.
+    for _ in range(count):
+        yield run_one(ser, name, a)
+        if delay:
+            time.sleep(delay)
 
 # ---------------------------
 # Autocomplete + history
@@ -451,26 +727,31 @@ def setup_readline() -> None:
     except Exception:
         pass
 
-    completions = sorted(set(
+    completions = tuple(sorted(set(
         list(COMMANDS.keys()) + 
         list(BUILTIN_ALIASES.keys()) + 
         list(user_aliases.keys()) + 
         list(REPL_COMMANDS.keys())
-    ))
+    )))
+    matches: List[str] = []
 
     def completer(text: str, state: int) -> Optional[str]:
-        buffer = readline.get_line_buffer()
-        tokens = buffer.split()
-        if len(tokens) <= 1:
-            opts = [c for c in completions if c.startswith(text)]
-        else:
-            opts = []
+        # readline calls this with state = 0, 1, ... for one Tab press;
+        # compute the matches once and then just index into them.
+        if state == 0:
+            # Only the first word is completed; text starts at begidx,
+            # so check there is nothing but whitespace before it.
+            if not readline.get_line_buffer()[:readline.get_begidx()].strip():
+                matches[:] = [c for c in completions if c.startswith(text)]
+            else:
+                matches[:] = []
         try:
-            return opts[state]
+            return matches[state]
         except IndexError:
             return None
 
     readline.set_completer(completer)
+    readline.set_completer_delims(" \t")
     readline.parse_and_bind("tab: complete")
 
 def save_history() -> None:
@@ -493,8 +774,10 @@ def show_help() -> None:
     print("  alias add <a> <cmd> - add alias (persists)")
     print("  alias rm <a>        - remove alias")
     print("  run <file>          - execute commands from file (one per line)")
-    print("  repeat N <cmd...>   - repeat N times (0.1s pause)")
-    print("  rvd N <cmd...>      - repeat N times (0.1s pause), but display only 'value' field")
+    print("  repeat [--delay MS] N <cmd...>")
+    print("                      - repeat N times (no pause by default)")
+    print("  rvd [--delay MS] N <cmd...>")
+    print("                      - same as repeat, but display only 'value' field")
     print("  json on|off         - toggle JSON-style responses display")
     print("")
     print("Arduino commands (you can use aliases):")
@@ -515,17 +798,29 @@ def show_aliases() -> None:
 # REPL
 # ---------------------------
 
+def read_line_plain(prompt: str) -> str:
+    # input() without readline; raises EOFError at end of input like input().
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line
+
 def interactive_repl(ser: serial.Serial, json_mode: bool) -> None:
     state = {"ser": ser, "json": json_mode}
 
     if readline:
         setup_readline()
+        read_line = input
+    else:
+        read_line = read_line_plain
 
     print("Interactive Arduino REPL. Ctrl+C to exit. 'help' for commands.")
 
     try:
         while True:
-            line = input("> ").strip()
+            line = read_line("> ").strip()
             if not line:
                 continue
 
@@ -533,10 +828,9 @@ def interactive_repl(ser: serial.Serial, json_mode: bool) -> None:
             cmd = parts[0].lower()
             args = parts[1:]
 
-            if cmd in REPL_COMMANDS_ALIASES:
-                cmd = REPL_COMMANDS_ALIASES[cmd]
-            if cmd in REPL_COMMANDS:
-                REPL_COMMANDS[cmd](state, args)
+            repl_cmd = REPL_DISPATCH.get(cmd)
+            if repl_cmd is not None:
+                repl_cmd(state, args)
                 continue
 
             res = run_one(ser, cmd, args)